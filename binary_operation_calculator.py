@@ -75,10 +75,10 @@ Example (3):
 | 1 | 2 | | 3     | 4   | 5         |
 | a | b | | a & b | ! a | [3] | [4] |
 +---+---+ +-------+-----+-----------+
-| 0 | 0 | |   1   |  0  |     1     |
+| 0 | 0 | |   0   |  1  |     1     |
 | 1 | 0 | |   0   |  0  |     0     |
-| 0 | 1 | |   1   |  0  |     1     |
-| 1 | 1 | |   0   |  1  |     1     |
+| 0 | 1 | |   0   |  1  |     1     |
+| 1 | 1 | |   1   |  0  |     1     |
 +---+---+ +-------+-----+-----------+
 """
 
@@ -90,7 +90,14 @@ Example (3):
 ################################################################################
 
 
-from operator import not_, and_, xor, or_
+import re
+import sys
+from collections.abc import Callable
+from functools import cache
+
+
+# bit `k` of byte `b` is BIT_OF[b * 8 + k]
+BIT_OF = bytes((b >> k) & 1 for b in range(256) for k in range(8))
 
 
 ################################################################################
@@ -101,6 +108,8 @@ from operator import not_, and_, xor, or_
 
 
 class Token:
+    __slots__ = ("type", "value")
+
     # token type
     LPAREN  = "("
     RPAREN  = ")"
@@ -131,39 +140,36 @@ class Token:
 
 
 class Lexer:
+    # whitespaces | single character tokens | variables | invalid character
+    TOKEN_PATTERN = re.compile(
+        rf"(\s+)|([{re.escape(Token.SINGLE_CHARACTER_TOKENS)}])|([^\W_]+)|(.)"
+    )
+
+
     def __init__(self, text: str) -> None:
         self.text = text
         self.pos = 0
 
+        # tokenize the whole text once, keeping the end position of each token
+        self.tokens = []
+        for match in self.TOKEN_PATTERN.finditer(text):
+            whitespaces, character, variable, invalid = match.groups()
 
-    def raise_exception(self, msg: str) -> None:
-        raise Exception(f"{msg} in pos={self.pos}\n")
-
+            if whitespaces:
+                continue
 
-    def get_next_token(self) -> Token:
-        # skip whitespaces
-        while self.pos < len(self.text) and self.text[self.pos].isspace():
-            self.pos += 1
+            if invalid:
+                self.pos = match.start()
+                self.raise_exception(f"Invalid character `{invalid}`")
 
-        # end of file
-        if self.pos >= len(self.text):
-            return Token(Token.EOF)
+            token = Token(character) if character else Token(Token.VAR, variable)
+            self.tokens.append((token, match.end()))
 
-        # single character tokens
-        if self.text[self.pos] in Token.SINGLE_CHARACTER_TOKENS:
-            token = Token(self.text[self.pos])
-            self.pos += 1
-            return token
+        self.tokens.append((Token(Token.EOF), len(text)))
 
-        # variables
-        if self.text[self.pos].isalnum():
-            variable = []
-            while self.pos < len(self.text) and self.text[self.pos].isalnum():
-                variable.append(self.text[self.pos])
-                self.pos += 1
-            return Token(Token.VAR, "".join(variable))
 
-        self.raise_exception(f"Invalid character `{self.text[self.pos]}`")
+    def raise_exception(self, msg: str) -> None:
+        raise Exception(f"{msg} in pos={self.pos}\n")
 
 
 ################################################################################
@@ -174,21 +180,28 @@ class Lexer:
 
 
 class BinaryOperator:
-    def __init__(self, token, operator, left, right) -> None:
+    __slots__ = ("token", "left", "right")
+
+
+    def __init__(self, token, left, right) -> None:
         self.token = token
-        self.operator = operator
         self.left = left
         self.right = right
 
 
 class UnaryOperator:
-    def __init__(self, token, operator, expr) -> None:
+    __slots__ = ("token", "expr")
+
+
+    def __init__(self, token, expr) -> None:
         self.token = token
-        self.operator = operator
         self.expr = expr
 
 
 class Variable:
+    __slots__ = ("token", "id")
+
+
     def __init__(self, token: Token, variable_id: int) -> None:
         self.token = token
         self.id = variable_id
@@ -207,15 +220,26 @@ AST = BinaryOperator | UnaryOperator | Variable
 class Parser:
     def __init__(self, lexer: Lexer) -> None:
         self.lexer = lexer
-        self.current_token = self.lexer.get_next_token()
+        self.tokens = self.lexer.tokens
+        self.index = 0
+        self.current_token = self.tokens[0][0]
         self.variables = dict()
 
 
+    def raise_exception(self, msg: str) -> None:
+        # report the end position of the current token
+        self.lexer.pos = self.tokens[self.index][1]
+        self.lexer.raise_exception(msg)
+
+
     def eat_token(self, token_type) -> None:
         if self.current_token.type != token_type:
-            self.lexer.raise_exception(f"Invalid syntax, expected `{token_type}`")
+            self.raise_exception(f"Invalid syntax, expected `{token_type}`")
 
-        self.current_token = self.lexer.get_next_token()
+        # EOF is the last token
+        if token_type != Token.EOF:
+            self.index += 1
+            self.current_token = self.tokens[self.index][0]
 
 
     def factor(self) -> AST:
@@ -225,12 +249,15 @@ class Parser:
 
         if token.type == Token.NOT:
             self.eat_token(Token.NOT)
-            return UnaryOperator(token, not_, self.factor())
+            return UnaryOperator(token, self.factor())
 
         if token.type == Token.VAR:
             self.eat_token(Token.VAR)
-            return Variable(token,
-                self.variables.setdefault(token.value, len(self.variables)))
+            variables = self.variables
+            variable_id = variables.get(token.value)
+            if variable_id is None:
+                variable_id = variables[token.value] = len(variables)
+            return Variable(token, variable_id)
 
         if token.type == Token.LPAREN:
             self.eat_token(Token.LPAREN)
@@ -238,7 +265,7 @@ class Parser:
             self.eat_token(Token.RPAREN)
             return node
 
-        self.lexer.raise_exception(f"Invalid syntax, expected `factor`")
+        self.raise_exception(f"Invalid syntax, expected `factor`")
 
 
     def expr_AND(self) -> AST:
@@ -249,7 +276,7 @@ class Parser:
         while self.current_token.type == Token.AND:
             token = self.current_token
             self.eat_token(Token.AND)
-            node = BinaryOperator(token, and_, node, self.factor())
+            node = BinaryOperator(token, node, self.factor())
 
         return node
 
@@ -262,7 +289,7 @@ class Parser:
         while self.current_token.type == Token.XOR:
             token = self.current_token
             self.eat_token(Token.XOR)
-            node = BinaryOperator(token, xor, node, self.expr_AND())
+            node = BinaryOperator(token, node, self.expr_AND())
 
         return node
 
@@ -275,7 +302,7 @@ class Parser:
         while self.current_token.type == Token.OR:
             token = self.current_token
             self.eat_token(Token.OR)
-            node = BinaryOperator(token, or_, node, self.expr_XOR())
+            node = BinaryOperator(token, node, self.expr_XOR())
 
         return node
 
@@ -309,10 +336,60 @@ class Parser:
 
 
 class Calculator:
+    # opcodes
+    OP_VAR      = 0
+    OP_NOT      = 1
+    OP_AND      = 2
+    OP_XOR      = 3
+    OP_OR       = 4
+    OP_CONST    = 5
+
+    BINARY_OPCODES = {Token.AND: OP_AND, Token.XOR: OP_XOR, Token.OR: OP_OR}
+
+
     def __init__(self, parser: Parser) -> None:
         self.parser = parser
         self.tree = self.parser.parse()
 
+        # truth table columns: bit `r` of a column is its value in row `r`
+        self.n = len(self.parser.variables)
+        self.mask = (1 << (1 << self.n)) - 1 # big interger
+        self.col = [self._column(k) for k in range(self.n)]
+
+        # value numbered bytecode of the tree, equal subtrees share one slot,
+        # `outputs` holds the slot of every operator node in postorder
+        table, code, self._outputs = {}, [], []
+        self._root = self._cse(self.tree, table, code, self._outputs)
+        code, left, right = zip(*code)
+        self._code = bytes(code)
+        self._left = left
+        self._right = right
+
+        # slots the root depends on, the rest are only needed for verbose
+        live = bytearray(len(self._code))
+        live[self._root] = 1
+        for i in reversed(range(len(self._code))):
+            if live[i] and self._code[i] not in (self.OP_VAR, self.OP_CONST):
+                live[left[i]] = 1
+                if right[i] >= 0:
+                    live[right[i]] = 1
+        self._live = [i for i, used in enumerate(live) if used]
+
+        # variable values of all rows, built by the first `result_iterator`
+        self._rows = None
+
+
+    def _column(self, k: int) -> int:
+        # blocks of `w` zeros and `w` ones, doubled up to `1 << n` bits
+        w = 1 << k
+        col = ((1 << w) - 1) << w
+        period, limit = w << 1, 1 << self.n
+        while period < limit:
+            col |= col << period
+            period <<= 1
+
+        return col
+
 
     def expr(self, verbose: bool = False) -> tuple[list[int], list[str]]:
         def visit(node: AST):
@@ -348,37 +425,138 @@ class Calculator:
         return indices, exprs
 
 
-    def result_iterator(self, verbose=False) -> tuple[list[bool], list[bool]]:
-        def visit(node: AST):
-            if isinstance(node, BinaryOperator):
-                sub_result = node.operator(visit(node.right), visit(node.left))
-                if verbose:
-                    results.append(sub_result)
-                return sub_result
+    def _cse(self, node: AST, table: dict, code: list, outputs: list) -> int:
+        if isinstance(node, BinaryOperator):
+            left = self._cse(node.left, table, code, outputs)
+            right = self._cse(node.right, table, code, outputs)
+            opcode = self.BINARY_OPCODES[node.token.type]
+            slot = self._fold(opcode, left, right, table, code)
+        elif isinstance(node, UnaryOperator):
+            expr = self._cse(node.expr, table, code, outputs)
+            slot = self._fold(self.OP_NOT, expr, -1, table, code)
+        elif isinstance(node, Variable):
+            return self._slot((self.OP_VAR, node.id, -1), table, code)
+        else:
+            raise Exception(f"AST error: invalid node type, node={node}\n")
 
-            if isinstance(node, UnaryOperator):
-                sub_result = node.operator(visit(node.expr))
-                if verbose:
-                    results.append(sub_result)
-                return sub_result
+        outputs.append(slot)
 
-            if isinstance(node, Variable):
-                return values[node.id]
+        return slot
 
-            raise Exception(f"AST error: invalid node type, node={node}\n")
 
-        n = len(self.parser.variables)
-        limit = 1 << n # big interger
+    def _slot(self, key: tuple, table: dict, code: list) -> int:
+        slot = table.get(key)
+        if slot is None:
+            slot = table[key] = len(code)
+            code.append(key)
 
-        for mask in range(limit):
-            values = [bool((mask >> i) & 1) for i in range(n)]
+        return slot
 
-            results = []
-            result = visit(self.tree)
-            if not verbose or not results:
-                results.append(result)
 
-            yield values, results
+    def _fold(self, opcode: int, a: int, b: int, table: dict, code: list):
+        def const(value: int) -> int:
+            return self._slot((self.OP_CONST, value, -1), table, code)
+
+        # `!!x = x`, `!0 = 1`, `!1 = 0`
+        if opcode == self.OP_NOT:
+            if code[a][0] == self.OP_NOT:
+                return code[a][1]
+            if code[a][0] == self.OP_CONST:
+                return const(1 - code[a][1])
+            return self._slot((opcode, a, -1), table, code)
+
+        # all binary operators are commutative
+        a, b = sorted((a, b))
+
+        # `x & x = x`, `x | x = x`, `x ^ x = 0`
+        if a == b:
+            return const(0) if opcode == self.OP_XOR else a
+
+        # `x & !x = 0`, `x | !x = 1`, `x ^ !x = 1`
+        if code[a] == (self.OP_NOT, b, -1) or code[b] == (self.OP_NOT, a, -1):
+            return const(0) if opcode == self.OP_AND else const(1)
+
+        # `x & 0 = 0`, `x & 1 = x`, `x | 0 = x`, `x | 1 = 1`, `x ^ 0 = x`,
+        # `x ^ 1 = !x`
+        for x, y in ((a, b), (b, a)):
+            if code[x][0] == self.OP_CONST:
+                value = code[x][1]
+                if opcode == self.OP_AND:
+                    return y if value else x
+                if opcode == self.OP_OR:
+                    return x if value else y
+                if value:
+                    return self._fold(self.OP_NOT, y, -1, table, code)
+                return y
+
+        return self._slot((opcode, a, b), table, code)
+
+
+    def _eval(self, values: list, mask, results: list | None = None):
+        # `values` are the variable columns and `mask` is the all-ones column,
+        # any type with `~`, `&`, `^` and `|` works: big integers, numpy arrays
+        OP_VAR, OP_NOT, OP_AND, OP_XOR, OP_CONST = (
+            self.OP_VAR, self.OP_NOT, self.OP_AND, self.OP_XOR, self.OP_CONST
+        )
+
+        code, left, right = self._code, self._left, self._right
+
+        slots = [None] * len(code)
+        order = range(len(code)) if results is not None else self._live
+
+        for i in order:
+            op, a, b = code[i], left[i], right[i]
+            if op == OP_VAR:
+                slots[i] = values[a]
+            elif op == OP_NOT:
+                slots[i] = ~slots[a] & mask
+            elif op == OP_AND:
+                slots[i] = slots[a] & slots[b]
+            elif op == OP_XOR:
+                slots[i] = slots[a] ^ slots[b]
+            elif op == OP_CONST:
+                slots[i] = mask if a else mask ^ mask
+            else:
+                slots[i] = slots[a] | slots[b]
+
+        if results is not None:
+            results.extend(slots[i] for i in self._outputs)
+
+        return slots[self._root]
+
+
+    def _unpack(self, cols: list[int]) -> bytes:
+        """Transpose bit columns into a row-major buffer, one byte per bit."""
+
+        rows, width = 1 << self.n, len(cols)
+        size = (rows + 7) >> 3
+
+        table = bytearray(rows * width)
+        for j, col in enumerate(cols):
+            # read the column byte-wise instead of shifting the big integer
+            bits = b"".join(
+                BIT_OF[b << 3:(b + 1) << 3] for b in col.to_bytes(size, "little")
+            )
+            table[j::width] = bits[:rows]
+
+        return bytes(table)
+
+
+    def result_iterator(self, verbose=False) -> tuple[bytes, bytes]:
+        sub_cols = []
+        result = self._eval(self.col, self.mask, sub_cols if verbose else None)
+        if not sub_cols:
+            sub_cols.append(result)
+
+        # row `m` assigns bit `i` of `m` to variable `i`
+        if self._rows is None:
+            self._rows = self._unpack(self.col)
+
+        n, k = self.n, len(sub_cols)
+        rows, results = self._rows, self._unpack(sub_cols)
+
+        for r in range(1 << n):
+            yield rows[r * n:(r + 1) * n], results[r * k:(r + 1) * k]
 
         return None
 
@@ -387,6 +565,126 @@ class Calculator:
         return tuple(self.result_iterator(verbose))
 
 
+    def result_numpy(self, verbose: bool = False) -> tuple:
+        import numpy as np
+
+        def unpack(cols):
+            # boolean matrix of shape (rows, columns)
+            bits = np.unpackbits(
+                np.column_stack(cols), axis=0, count=limit, bitorder="little"
+            )
+            return bits.view(bool)
+
+        # evaluate on columns packed 8 rows per byte, the big integer columns
+        # already hold row `r` in bit `r & 7` of byte `r >> 3`
+        limit = 1 << self.n
+        size = (limit + 7) >> 3
+        cols = [
+            np.frombuffer(col.to_bytes(size, "little"), np.uint8)
+            for col in self.col
+        ]
+        mask = np.frombuffer(self.mask.to_bytes(size, "little"), np.uint8)
+
+        sub_cols = []
+        result = self._eval(cols, mask, sub_cols if verbose else None)
+        if not sub_cols:
+            sub_cols.append(result)
+
+        return unpack(cols), unpack(sub_cols)
+
+
+    def result_bitarray(self, verbose: bool = False) -> tuple[list, list]:
+        from bitarray import bitarray
+        from bitarray.util import int2ba
+
+        # bit columns, index `r` of a column is its value in row `r`
+        limit = 1 << self.n
+        cols = [int2ba(col, limit, "little") for col in self.col]
+        mask = bitarray(limit, "little")
+        mask.setall(1)
+
+        sub_cols = []
+        result = self._eval(cols, mask, sub_cols if verbose else None)
+        if not sub_cols:
+            sub_cols.append(result)
+
+        return cols, sub_cols
+
+
+    def result_numba(self, verbose: bool = False) -> tuple:
+        import numpy as np
+
+        def unpack(words):
+            # boolean matrix of shape (rows, columns)
+            bits = np.unpackbits(
+                words.view(np.uint8), axis=1, count=limit, bitorder="little"
+            )
+            return bits.T.view(bool)
+
+        # (columns, words) of 64 rows per word, read from the big integer
+        # columns that already hold row `r` in bit `r`
+        limit = 1 << self.n
+        size = (limit + 63) >> 6
+        cols = np.array([
+            np.frombuffer(col.to_bytes(size * 8, "little"), np.uint64)
+            for col in self.col
+        ])
+        mask = np.frombuffer(self.mask.to_bytes(size * 8, "little"), np.uint64)
+
+        order, outputs = self._live, [self._root]
+        if verbose and self._outputs:
+            order, outputs = range(len(self._code)), self._outputs
+
+        slots = numba_kernel()(
+            np.frombuffer(self._code, np.uint8),
+            np.array(self._left, np.int64),
+            np.array(self._right, np.int64),
+            np.array(order, np.int64),
+            cols,
+            mask,
+            np.zeros((len(self._code), size), np.uint64),
+        )
+
+        return unpack(cols), unpack(slots[outputs])
+
+
+@cache
+def numba_kernel() -> Callable:
+    """Compile the bytecode interpreter over 64-row words with numba."""
+
+    from numba import njit
+
+    OP_VAR, OP_NOT, OP_AND, OP_XOR, OP_CONST = (
+        Calculator.OP_VAR,
+        Calculator.OP_NOT,
+        Calculator.OP_AND,
+        Calculator.OP_XOR,
+        Calculator.OP_CONST,
+    )
+
+    @njit
+    def run(code, left, right, order, cols, mask, slots):
+        for i in order:
+            op, a, b = code[i], left[i], right[i]
+            if op == OP_VAR:
+                slots[i] = cols[a]
+            elif op == OP_NOT:
+                slots[i] = ~slots[a] & mask
+            elif op == OP_AND:
+                slots[i] = slots[a] & slots[b]
+            elif op == OP_XOR:
+                slots[i] = slots[a] ^ slots[b]
+            elif op == OP_CONST:
+                # slots start zeroed
+                if a:
+                    slots[i] = mask
+            else:
+                slots[i] = slots[a] | slots[b]
+        return slots
+
+    return run
+
+
 ################################################################################
 #                                                                              #
 # MAIN                                                                         #
@@ -395,61 +693,48 @@ class Calculator:
 
 
 def print_table(calc: Calculator, verbose: bool = False) -> None:
+    def line_format(align: str) -> str:
+        return (
+            "|"
+            + "".join(f" {{:{align}{s}}} |" for s in sizes[:idx_sep])
+            + " |"
+            + "".join(f" {{:{align}{s}}} |" for s in sizes[idx_sep:])
+        )
+
     indices, exprs = calc.expr(verbose)
     idx_sep = len(calc.parser.variables)
 
     sizes = tuple(max(len(str(i)), len(e)) for i, e in zip(indices, exprs))
 
-    print(
-        "+", 
-        "-+-".join("-" * s for s in sizes[:idx_sep]),
-        "+ +",
-        "-+-".join("-" * s for s in sizes[idx_sep:]),
-        "+",
-        sep="-",
+    dashes = ["-" * s for s in sizes]
+    separator = (
+        f"+-{'-+-'.join(dashes[:idx_sep])}-+ +-{'-+-'.join(dashes[idx_sep:])}-+"
     )
-
-    print("|", end="")
-    for k, (i, s) in enumerate(zip(indices, sizes)):
-        if k == idx_sep:
-            print(" |", end="")
-        print(f" {i:<{s}} |", end="")
-    print()
-
-    print("|", end="")
-    for k, (e, s) in enumerate(zip(exprs, sizes)):
-        if k == idx_sep:
-            print(" |", end="")
-        print(f" {e:<{s}} |", end="")
-    print()
-
-    print(
-        "+", 
-        "-+-".join("-" * s for s in sizes[:idx_sep]),
-        "+ +",
-        "-+-".join("-" * s for s in sizes[idx_sep:]),
-        "+",
-        sep="-",
+    header_format = line_format("<")
+    row_format = line_format("^")
+
+    lines = [
+        separator,
+        header_format.format(*indices),
+        header_format.format(*exprs),
+        separator,
+    ]
+    lines.extend(
+        row_format.format(*params, *results)
+        for params, results in calc.result_iterator(verbose)
     )
+    lines.append(separator)
 
-    for params, results in calc.result_iterator(verbose):
-        print("|", end="")
-        for p, s in zip(params, sizes[:idx_sep]):
-            print(f" {int(p):^{s}} |", end="")
-        print(" |", end="")
+    table = "\n".join(lines) + "\n"
 
-        for r, s in zip(results, sizes[idx_sep:]):
-            print(f" {int(r):^{s}} |", end="")
-        print()
+    # write encoded bytes past the text layer when the stream has one
+    buffer = getattr(sys.stdout, "buffer", None)
+    if buffer is None:
+        sys.stdout.write(table)
+        return None
 
-    print(
-        "+", 
-        "-+-".join("-" * s for s in sizes[:idx_sep]),
-        "+ +",
-        "-+-".join("-" * s for s in sizes[idx_sep:]),
-        "+",
-        sep="-",
-    )
+    sys.stdout.flush()
+    buffer.write(table.encode(sys.stdout.encoding, sys.stdout.errors))
 
 
 def main():